@@ -7,6 +7,7 @@ from src.icon_detector import register_templates
 from src.notepad import (
     close_notepad,
     fetch_posts,
+    get_notepad_windows,
     launch_notepad,
     write_post_to_notepad,
 )
@@ -14,18 +15,16 @@ from src.config import TEMPLATE_DIR, PROJECT_PATH, SPACING
 
 
 def process_post(post: dict, bot: DesktopBot, template_labels: list[str]):
-    """Process a single post: launch Notepad, write content, and close."""
+    """Process a single post in the open Notepad session, relaunching it if needed."""
     print(f"Processing Post ID: {post['id']}")
 
-    close_notepad()
-    
-    if not launch_notepad(bot, template_labels):
+    notepad_open = any(win.visible for win in get_notepad_windows())
+    if not notepad_open and not launch_notepad(bot, template_labels):
         print(f"Skipping post {post['id']} due to launch failure.")
         return
 
     try:
         write_post_to_notepad(post, PROJECT_PATH)
-        close_notepad()
     except Exception as e:
         print(f"Error processing post {post['id']}: {e}")
 
@@ -55,8 +54,11 @@ def main():
         return
 
 
+    # Launch Notepad once and write every post as a new tab
+    close_notepad()
     for post in posts[:10]:
         process_post(post, bot, template_labels)
+    close_notepad()
 
 
 if __name__ == "__main__":
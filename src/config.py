@@ -7,10 +7,26 @@ PROJECT_PATH = Path.home() / "Desktop" / "tjm-project"
 
 # API
 API_URL = "https://jsonplaceholder.typicode.com/posts"
+API_TIMEOUT = 5 # seconds
 
 # Template matching
 MATCHING_THRESHOLD = 0.9
 FIND_WAIT_TIME = 150 # milliseconds
+EARLY_EXIT_THRESHOLD = 0.95 # skip the remaining templates above this score
+
+# Image pyramid (coarse search on a downscaled screen, refined at full resolution)
+PYRAMID_SCALE = 4
+PYRAMID_MIN_SIZE = 8 # pixels, smaller coarse templates are matched at full resolution
+PYRAMID_PADDING = 8 # pixels around the coarse match for the full resolution search
+PYRAMID_CANDIDATES = 3 # best coarse locations refined at full resolution
+FFT_MIN_TEMPLATES = 8 # coarse search via one shared screen FFT from this many templates
+SCREEN_HASH_STRIDE = 8 # pixels between sampled rows/columns when checking for screen changes
+
+# Search region around the cached icon coordinates
+CACHE_REGION_SIZE = 200 # pixels
 
 # Spacing (time delays in seconds)
 SPACING = 0.25
+POLL_INTERVAL = 0.05 # interval for polling window state
+DIALOG_POLL_INTERVAL = 0.01 # interval for polling dialogs by exact title
+WINDOW_CACHE_TTL = 0.04 # reuse a window lookup within this time, kept below POLL_INTERVAL
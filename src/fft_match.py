@@ -0,0 +1,67 @@
+"""FFT-based normalized cross-correlation for large template sets."""
+import cv2
+import numpy as np
+
+# Conjugated template spectra by (label, FFT shape), computed once per screen size
+_template_spectra: dict[tuple[str, tuple[int, int]], np.ndarray] = {}
+
+
+def prepare_screen(screen: np.ndarray) -> tuple[np.ndarray, tuple[int, int], np.ndarray, np.ndarray]:
+    """Compute the screen spectrum and integral images shared by every template.
+    
+    Args:
+        screen: Grayscale screen image
+    
+    Returns:
+        Tuple of (spectrum, FFT shape, integral image, squared integral image)
+    """
+    screen_h, screen_w = screen.shape
+    # No wrap-around reaches the valid correlation area as long as the FFT covers the screen
+    fft_shape = (cv2.getOptimalDFTSize(screen_h), cv2.getOptimalDFTSize(screen_w))
+    spectrum = np.fft.rfft2(screen, s=fft_shape)
+    sums, sq_sums = cv2.integral2(screen, sdepth=cv2.CV_64F, sqdepth=cv2.CV_64F)
+    return spectrum, fft_shape, sums, sq_sums
+
+
+def _template_spectrum(template: np.ndarray, label: str, fft_shape: tuple[int, int]) -> np.ndarray:
+    """Return the cached conjugated spectrum of a zero-mean template."""
+    key = (label, fft_shape)
+    if key not in _template_spectra:
+        zero_mean = template - template.mean()
+        _template_spectra[key] = np.conj(np.fft.rfft2(zero_mean, s=fft_shape))
+    return _template_spectra[key]
+
+
+def correlate(
+    screen_data: tuple[np.ndarray, tuple[int, int], np.ndarray, np.ndarray],
+    template: np.ndarray,
+    label: str,
+) -> np.ndarray:
+    """Score every template position like cv2.TM_CCOEFF_NORMED, using FFT correlation.
+    
+    Args:
+        screen_data: Result of prepare_screen for the screen being searched
+        template: Grayscale template, smaller than the screen
+        label: Template label, used to cache its spectrum
+    
+    Returns:
+        Score map of shape (screen_h - h + 1, screen_w - w + 1)
+    """
+    spectrum, fft_shape, sums, sq_sums = screen_data
+    screen_h, screen_w = sums.shape[0] - 1, sums.shape[1] - 1
+    h, w = template.shape
+    
+    corr = np.fft.irfft2(spectrum * _template_spectrum(template, label, fft_shape), s=fft_shape)
+    corr = corr[:screen_h - h + 1, :screen_w - w + 1]
+    
+    # Per-window sums from the integral images give the local variance of the screen
+    window_sum = sums[h:, w:] - sums[:-h, w:] - sums[h:, :-w] + sums[:-h, :-w]
+    window_sq_sum = sq_sums[h:, w:] - sq_sums[:-h, w:] - sq_sums[h:, :-w] + sq_sums[:-h, :-w]
+    variance = np.maximum(window_sq_sum - window_sum ** 2 / (h * w), 0)
+    
+    template_norm = np.linalg.norm(template - template.mean())
+    denom = np.sqrt(variance) * template_norm
+    # Flat windows have no defined correlation, score them as 0
+    scores = np.zeros_like(corr)
+    np.divide(corr, denom, out=scores, where=denom > 1e-6)
+    return scores.astype(np.float32)
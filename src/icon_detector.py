@@ -1,13 +1,47 @@
 """Template registration and icon finding."""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+import cv2
+import mss
+import numpy as np
 import pyautogui
 from botcity.core import DesktopBot
 
-from .config import MATCHING_THRESHOLD, FIND_WAIT_TIME
+from . import fft_match
+from .config import (
+    MATCHING_THRESHOLD,
+    FIND_WAIT_TIME,
+    EARLY_EXIT_THRESHOLD,
+    PYRAMID_SCALE,
+    PYRAMID_MIN_SIZE,
+    PYRAMID_PADDING,
+    PYRAMID_CANDIDATES,
+    FFT_MIN_TEMPLATES,
+    CACHE_REGION_SIZE,
+    SCREEN_HASH_STRIDE,
+)
 
 # Icon cache for faster subsequent lookups / in case of the same coordinates
 icon_cache: tuple[int, int] | None = None
 
+# Preprocessed templates by label: (grayscale, mask, downscaled grayscale or None)
+template_cache: dict[str, tuple[np.ndarray, np.ndarray | None, np.ndarray | None]] = {}
+
+# Confident matches per template label, used to try the usual winner first
+template_hits: dict[str, int] = {}
+
+# Screen capture handle, created on first use and reused for every search
+_sct = None
+
+# Hash of the last searched screen and its result, to skip matching an unchanged screen
+_last_hash: int | None = None
+_last_result: tuple[float, tuple[int, int]] | None = None
+
+# Worker pool for matching templates in parallel (matchTemplate releases the GIL)
+_executor = ThreadPoolExecutor(max_workers=os.cpu_count())
+
 
 def register_templates(bot: DesktopBot, directory: Path) -> bool:
     """Register all PNG templates from the given directory."""
@@ -17,6 +51,7 @@ def register_templates(bot: DesktopBot, directory: Path) -> bool:
     for img_path in directory.glob("*.png"):
         label = img_path.stem
         bot.add_image(label, str(img_path.resolve()))
+        template_cache[label] = _load_template(img_path)
     
     return True
 
@@ -33,6 +68,191 @@ def invalidate_cache():
     icon_cache = None
 
 
+# ============================================================================
+# Template Matching
+# ============================================================================
+
+def _grab_screen(around: tuple[int, int] | None = None):
+    """Capture the primary monitor, or a CACHE_REGION_SIZE square of it centered on `around`.
+    
+    A single mss instance is reused across calls.
+    """
+    global _sct
+    if _sct is None:
+        _sct = mss.mss()
+    monitor = _sct.monitors[1]
+    if around:
+        x, y = around
+        size = min(CACHE_REGION_SIZE, monitor["width"], monitor["height"])
+        left = min(max(x - size // 2, monitor["left"]), monitor["left"] + monitor["width"] - size)
+        top = min(max(y - size // 2, monitor["top"]), monitor["top"] + monitor["height"] - size)
+        monitor = {"left": left, "top": top, "width": size, "height": size}
+    return _sct.grab(monitor)
+
+
+def _load_template(img_path: Path) -> tuple[np.ndarray, np.ndarray | None, np.ndarray | None]:
+    """Load a template as grayscale with its alpha mask and downscaled version."""
+    template = cv2.imread(str(img_path), cv2.IMREAD_UNCHANGED)
+    if template.ndim == 3 and template.shape[2] == 4:
+        alpha = template[:, :, 3]
+        # Fully opaque templates don't need a mask
+        mask = None if alpha.min() == 255 else np.ascontiguousarray(alpha)
+        gray = cv2.cvtColor(template, cv2.COLOR_BGRA2GRAY)
+    elif template.ndim == 3:
+        mask = None
+        gray = cv2.cvtColor(template, cv2.COLOR_BGR2GRAY)
+    else:
+        mask = None
+        gray = template
+    # Stored as float32 so matchTemplate doesn't widen it on every search
+    gray = np.ascontiguousarray(gray, dtype=np.float32)
+    
+    scale = 1 / PYRAMID_SCALE
+    small = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    if min(small.shape) < PYRAMID_MIN_SIZE:
+        # Too small to survive downscaling, matched at full resolution only
+        small = None
+    return gray, mask, small
+
+
+def _match(screen: np.ndarray, template: np.ndarray, mask: np.ndarray | None = None) -> tuple[float, tuple[int, int]]:
+    """Run a single matchTemplate and return the best score and its top-left location."""
+    result = cv2.matchTemplate(screen, template, cv2.TM_CCOEFF_NORMED, mask=mask)
+    # Masked matching yields NaN/inf on flat windows
+    np.nan_to_num(result, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
+    _, max_val, _, max_loc = cv2.minMaxLoc(result)
+    return max_val, max_loc
+
+
+def _coarse_candidates(
+    screen_small: np.ndarray,
+    template_small: np.ndarray,
+    label: str,
+    screen_data: tuple | None = None,
+) -> list[tuple[int, int]]:
+    """Return the best distinct top-left locations of a template on the downscaled screen.
+    
+    With screen_data from fft_match.prepare_screen, the shared screen FFT is used instead.
+    """
+    if screen_data is not None:
+        result = fft_match.correlate(screen_data, template_small, label)
+    else:
+        result = cv2.matchTemplate(screen_small, template_small, cv2.TM_CCOEFF_NORMED)
+        np.nan_to_num(result, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
+    h, w = template_small.shape
+    candidates = []
+    for _ in range(PYRAMID_CANDIDATES):
+        _, _, _, (x, y) = cv2.minMaxLoc(result)
+        candidates.append((x, y))
+        # Suppress the neighbourhood so the next pick is a different location
+        result[max(y - h // 2, 0):y + h // 2 + 1, max(x - w // 2, 0):x + w // 2 + 1] = -1
+    return candidates
+
+
+def _pyramid_match(
+    screen_gray: np.ndarray,
+    screen_small: np.ndarray,
+    template: np.ndarray,
+    mask: np.ndarray | None,
+    template_small: np.ndarray | None,
+    label: str,
+    screen_data: tuple | None = None,
+) -> tuple[float, tuple[int, int]]:
+    """Locate a template on a downscaled screen, then refine the best candidates at full resolution."""
+    h, w = template.shape
+    if template_small is None:
+        return _match(screen_gray, template, mask)
+    
+    # Coarse search, the mask is only applied at full resolution
+    screen_h, screen_w = screen_gray.shape
+    best = None
+    for x, y in _coarse_candidates(screen_small, template_small, label, screen_data):
+        left = max(x * PYRAMID_SCALE - PYRAMID_PADDING, 0)
+        top = max(y * PYRAMID_SCALE - PYRAMID_PADDING, 0)
+        right = min(x * PYRAMID_SCALE + w + PYRAMID_PADDING, screen_w)
+        bottom = min(y * PYRAMID_SCALE + h + PYRAMID_PADDING, screen_h)
+        roi = screen_gray[top:bottom, left:right]
+        if roi.shape[0] < h or roi.shape[1] < w:
+            return _match(screen_gray, template, mask)
+        
+        max_val, (roi_x, roi_y) = _match(roi, template, mask)
+        if best is None or max_val > best[0]:
+            best = (max_val, (left + roi_x, top + roi_y))
+    
+    return best
+
+
+def _match_label(
+    screen_gray: np.ndarray,
+    screen_small: np.ndarray,
+    label: str,
+    screen_data: tuple | None = None,
+) -> tuple[str, float, tuple[int, int], int, int] | None:
+    """Match one cached template and return (label, score, top-left, width, height)."""
+    if label not in template_cache:
+        return None
+    template, mask, template_small = template_cache[label]
+    h, w = template.shape
+    if h > screen_gray.shape[0] or w > screen_gray.shape[1]:
+        return None
+    
+    max_val, max_loc = _pyramid_match(screen_gray, screen_small, template, mask, template_small, label, screen_data)
+    return label, max_val, max_loc, w, h
+
+
+def find_icon_with_multiple_templates(
+    template_labels: list[str],
+    around: tuple[int, int] | None = None,
+) -> tuple[float, tuple[int, int]] | None:
+    """Match all templates against a single screenshot and return the best one.
+    
+    Args:
+        template_labels: List of template labels to search
+        around: Screen coordinates to search around instead of the full screen
+    
+    Returns:
+        Tuple of (score, (x, y)) with the center of the best match, or None if no template fits the screen
+    """
+    global _last_hash, _last_result
+    sct_img = _grab_screen(around)
+    # View the raw BGRA buffer without copying it
+    screen = np.frombuffer(sct_img.raw, dtype=np.uint8).reshape(sct_img.height, sct_img.width, 4)
+    screen_gray = cv2.cvtColor(screen, cv2.COLOR_BGRA2GRAY)
+    
+    # Nothing to match again if the same region looks unchanged since the last search
+    sample = screen_gray[::SCREEN_HASH_STRIDE, ::SCREEN_HASH_STRIDE].tobytes()
+    screen_hash = hash((sct_img.left, sct_img.top, sct_img.width, sct_img.height, tuple(template_labels), sample))
+    if screen_hash == _last_hash:
+        return _last_result
+    
+    # Widen once per grab instead of once per template inside matchTemplate
+    screen_gray = screen_gray.astype(np.float32)
+    scale = 1 / PYRAMID_SCALE
+    screen_small = cv2.resize(screen_gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    
+    # Try the template that matched most often first, it usually wins outright
+    labels = sorted(template_labels, key=lambda label: template_hits.get(label, 0), reverse=True)
+    # With many templates, one screen FFT shared by all coarse searches is cheaper
+    screen_data = fft_match.prepare_screen(screen_small) if len(labels) >= FFT_MIN_TEMPLATES else None
+    first = _match_label(screen_gray, screen_small, labels[0], screen_data) if labels else None
+    if first and first[1] >= EARLY_EXIT_THRESHOLD:
+        results = [first]
+    else:
+        results = _executor.map(lambda label: _match_label(screen_gray, screen_small, label, screen_data), labels[1:])
+        results = [result for result in [first, *results] if result]
+    
+    best = None
+    if results:
+        label, max_val, (x, y), w, h = max(results, key=lambda result: result[1])
+        if max_val >= MATCHING_THRESHOLD:
+            template_hits[label] = template_hits.get(label, 0) + 1
+        # Convert from capture-relative to screen coordinates
+        best = (max_val, (sct_img.left + x + w // 2, sct_img.top + y + h // 2))
+    
+    _last_hash, _last_result = screen_hash, best
+    return best
+
+
 def find_icon(bot: DesktopBot, template_labels: list[str], use_cache: bool = True) -> tuple[int, int] | None:
     """Find an icon from the given template labels, double-click it, and return coordinates.
     
@@ -45,25 +265,29 @@ def find_icon(bot: DesktopBot, template_labels: list[str], use_cache: bool = Tru
         Tuple of (x, y) coordinates or None if not found
     """
     global icon_cache
-    # Try to find the icon using the cache
+    # Accept weaker matches down to the fallback threshold
+    min_score = MATCHING_THRESHOLD - 0.1
+    
+    # Try to find the icon around the cached coordinates first
     if use_cache and icon_cache:
-        coords = icon_cache
-        x, y = coords
-        pyautogui.doubleClick(x, y)
-        return coords
-    
-    thresholds = [MATCHING_THRESHOLD, MATCHING_THRESHOLD - 0.1]
-    for threshold in thresholds:
-        for label in template_labels:
-            if bot.find(label=label, matching=threshold, waiting_time=FIND_WAIT_TIME):
-                # Get coordinates immediately after successful find
-                coords = bot.get_element_coords(label, matching=threshold)
-                
-                if coords:
-                    x, y = int(coords[0]), int(coords[1])
-                    set_cache((x, y))
-                    pyautogui.doubleClick(x, y)
-                    return (x, y)
-    
-    return None
+        match = find_icon_with_multiple_templates(template_labels, around=icon_cache)
+        if match and match[0] >= min_score:
+            x, y = match[1]
+            set_cache((x, y))
+            pyautogui.doubleClick(x, y)
+            return (x, y)
+        # The icon moved, fall back to a full screen search
+        invalidate_cache()
+    
+    end_time = time.time() + FIND_WAIT_TIME / 1000
+    while True:
+        match = find_icon_with_multiple_templates(template_labels)
+        if match and match[0] >= min_score:
+            x, y = match[1]
+            set_cache((x, y))
+            pyautogui.doubleClick(x, y)
+            return (x, y)
+        
+        if time.time() >= end_time:
+            return None
 
@@ -1,14 +1,36 @@
 """Notepad window management functions."""
+import ctypes
 import time
+from ctypes import wintypes
 import pyautogui
 import pyperclip
 import pygetwindow as gw
 import requests
 from pathlib import Path
+from requests.adapters import HTTPAdapter
 from botcity.core import DesktopBot
 
 from .icon_detector import find_icon, set_cache, invalidate_cache
-from .config import API_URL, SPACING
+from .config import (
+    API_URL,
+    API_TIMEOUT,
+    SPACING,
+    POLL_INTERVAL,
+    DIALOG_POLL_INTERVAL,
+    WINDOW_CACHE_TTL,
+)
+
+# Own user32 handle so the argtypes below don't leak into other ctypes users
+_user32 = ctypes.WinDLL("user32")
+_user32.FindWindowW.argtypes = [wintypes.LPCWSTR, wintypes.LPCWSTR]
+_user32.FindWindowW.restype = wintypes.HWND
+
+# Last Notepad window lookup as (monotonic timestamp, windows)
+_window_cache: tuple[float, list] | None = None
+
+# Shared HTTP session so repeated API calls reuse the keep-alive connection
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
 
 
 # ============================================================================
@@ -20,10 +42,20 @@ def _wait(delay: float = SPACING):
     time.sleep(delay)
 
 
+def _wait_until(predicate, timeout: float, interval: float = POLL_INTERVAL) -> bool:
+    """Poll a condition until it holds or the timeout expires. Returns True if it held."""
+    end_time = time.time() + timeout
+    while time.time() < end_time:
+        if predicate():
+            return True
+        _wait(interval)
+    return False
+
+
 def _activate_and_click_center(window):
     """Activate a window and click its center."""
     window.activate()
-    _wait()
+    _wait_until(lambda: window.isActive, SPACING)
     center_x = window.left + window.width // 2
     center_y = window.top + window.height // 2
     pyautogui.click(center_x, center_y)
@@ -43,17 +75,17 @@ def _wait_for_dialog(title: str, timeout: float, wait_for_appear: bool = True) -
     """
     end_time = time.time() + timeout
     while time.time() < end_time:
-        dialogs = gw.getWindowsWithTitle(title)
-        found = bool(dialogs)
+        # A single exact-title lookup instead of enumerating every top-level window
+        hwnd = _user32.FindWindowW(None, title)
         
-        if wait_for_appear and found:
-            dialogs[0].activate()
+        if wait_for_appear and hwnd:
+            gw.Win32Window(hwnd).activate()
             _wait()
             return True
-        elif not wait_for_appear and not found:
+        elif not wait_for_appear and not hwnd:
             return True
         
-        _wait()
+        _wait(DIALOG_POLL_INTERVAL)
     
     return False if wait_for_appear else True
 
@@ -62,15 +94,30 @@ def _wait_for_dialog(title: str, timeout: float, wait_for_appear: bool = True) -
 # ============================================================================
 
 def get_notepad_windows():
-    all_windows = gw.getWindowsWithTitle("Notepad")
-    notepad_windows = []
+    """Return Notepad windows, reusing a lookup made within WINDOW_CACHE_TTL."""
+    global _window_cache
+    now = time.monotonic()
+    if _window_cache and now - _window_cache[0] < WINDOW_CACHE_TTL:
+        return _window_cache[1]
     
-    for window in all_windows:
-        title = window.title.lower()
-        if title == "notepad" or title.endswith(" - notepad"):
-            notepad_windows.append(window)
+    all_windows = gw.getWindowsWithTitle("Notepad")
+    if not all_windows:
+        notepad_windows = []
+    else:
+        notepad_windows = [
+            window for window in all_windows
+            if (title := window.title.lower()) == "notepad" or title.endswith(" - notepad")
+        ]
     
+    _window_cache = (now, notepad_windows)
     return notepad_windows
+
+
+def _invalidate_window_cache():
+    """Force the next lookup to enumerate windows again after an action that changes them."""
+    global _window_cache
+    _window_cache = None
+
 # ============================================================================
 # Window Closing
 # ============================================================================
@@ -85,12 +132,10 @@ def close_notepad() -> bool:
     for window in active_windows:
         if window.visible:
             window.close()
+    _invalidate_window_cache()
     
-    _wait(0.5)
-    
-    # Check if any windows remain visible
-    remaining = get_notepad_windows()
-    return not remaining or not any(win.visible for win in remaining)
+    # Wait until no windows remain visible
+    return _wait_until(lambda: not any(win.visible for win in get_notepad_windows()), 0.5)
 
 
 # ============================================================================
@@ -120,16 +165,13 @@ def launch_notepad(bot: DesktopBot, template_labels: list[str]) -> bool:
 
 def _verify_notepad_launched(coords: tuple[int, int] | None) -> bool:
     """Verify that Notepad launched successfully."""
-    timeout = time.time() + 5
-    while time.time() < timeout:
-        active_windows = get_notepad_windows()
-        if any(win.visible for win in active_windows):
-            if coords:
-                set_cache(coords)
-            _wait()
-            return True
-        _wait()
-    return False
+    _invalidate_window_cache()
+    if not _wait_until(lambda: any(win.visible for win in get_notepad_windows()), 5):
+        return False
+    if coords:
+        set_cache(coords)
+    _wait()
+    return True
 
 
 # ============================================================================
@@ -143,21 +185,29 @@ def _prepare_notepad_window():
         _activate_and_click_center(active_windows[0])
 
 
-def _paste_content(content: str):
-    """Paste content into Notepad using clipboard."""
+def _paste_content(content: str, fresh: bool = False):
+    """Paste content into Notepad using clipboard.
+    
+    Args:
+        content: Text to paste
+        fresh: Whether the document is a new, empty tab that doesn't need clearing
+    """
     pyperclip.copy(content)
     _wait()
-    # Select all content, delete it, and paste the new content
-    pyautogui.hotkey('ctrl', 'a')
-    _wait()
-    pyautogui.press('delete')
-    _wait()
+    if not fresh:
+        # Select all content and delete it before pasting the new content
+        pyautogui.hotkey('ctrl', 'a')
+        _wait()
+        pyautogui.press('delete')
+        _wait()
     pyautogui.hotkey('ctrl', 'v')
     _wait()
 
 
 def _save_file(filepath: str) -> bool:
     """Save file via Save As dialog. Returns True if successful."""
+    # Stage the path on the clipboard while the dialog is opening
+    pyperclip.copy(filepath)
     pyautogui.hotkey('ctrl', 's')
     _wait()
     
@@ -166,12 +216,14 @@ def _save_file(filepath: str) -> bool:
     
     pyautogui.hotkey('ctrl', 'a')
     _wait()
-    pyperclip.copy(filepath)
-    _wait()
     pyautogui.hotkey('ctrl', 'v')
     _wait()
     pyautogui.press('enter')
-    _wait()
+    # Either the dialog closes or a confirmation pops up if the file exists
+    _wait_until(
+        lambda: gw.getWindowsWithTitle("Confirm Save As") or not gw.getWindowsWithTitle("Save As"),
+        2.0,
+    )
     
     # Handle confirmation dialog if file exists
     confirm_window = gw.getWindowsWithTitle("Confirm Save As")
@@ -187,17 +239,19 @@ def _save_file(filepath: str) -> bool:
 
 
 def write_post_to_notepad(post: dict, project_path: Path):
-    """Write post content to Notepad and save it."""
+    """Write post content to a new tab in the open Notepad, save it, and close the tab."""
     # Wait for any existing Save As dialogs to close before starting
     _wait_for_dialog("Save As", 2.0, wait_for_appear=False)
     
     _prepare_notepad_window()
     pyautogui.hotkey('ctrl', 'n')
+    _invalidate_window_cache()
+    # The new tab has the same "Untitled" title as the one it replaces, so there is no state to poll
     _wait()
     _prepare_notepad_window()
     
     content = f"Title: {post['title']}\n\n{post['body']}"
-    _paste_content(content)
+    _paste_content(content, fresh=True)
     
     filename = f"post_{post['id']}.txt"
     filepath = str(project_path / filename)
@@ -211,15 +265,14 @@ def write_post_to_notepad(post: dict, project_path: Path):
     
     # Close the tab/document
     pyautogui.hotkey('ctrl', 'w')
-    _wait()
-    
-    close_notepad()
+    _invalidate_window_cache()
+    _wait_until(lambda: not any(filename in win.title for win in get_notepad_windows()), 1.0)
 
 # API fetching
 def fetch_posts() -> list[dict] | None:
     """Fetch posts from the API."""
     try:
-        response = requests.get(API_URL)
+        response = _session.get(API_URL, timeout=API_TIMEOUT)
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
@@ -0,0 +1,116 @@
+"""Placement tests for icon detection against a real desktop screenshot."""
+from pathlib import Path
+
+import cv2
+import mss.screenshot
+import numpy as np
+import pytest
+
+from src import icon_detector
+from src.config import MATCHING_THRESHOLD, CACHE_REGION_SIZE
+
+ROOT = Path(__file__).resolve().parent.parent
+TEMPLATE_DIR = ROOT / "assets" / "templates"
+DESKTOP = ROOT / "deliverables" / "central.png"
+LABELS = sorted(img_path.stem for img_path in TEMPLATE_DIR.glob("*.png"))
+
+
+class FakeScreen:
+    """Stands in for the mss instance, serving grabs from an in-memory BGR image."""
+
+    def __init__(self, image: np.ndarray):
+        self.image = cv2.cvtColor(image, cv2.COLOR_BGR2BGRA)
+        height, width = image.shape[:2]
+        self.monitors = [None, {"left": 0, "top": 0, "width": width, "height": height}]
+        self.grabs = []
+
+    def grab(self, monitor):
+        self.grabs.append(monitor)
+        left, top, width, height = monitor["left"], monitor["top"], monitor["width"], monitor["height"]
+        region = np.ascontiguousarray(self.image[top:top + height, left:left + width])
+        return mss.screenshot.ScreenShot(bytearray(region.tobytes()), monitor)
+
+
+@pytest.fixture(autouse=True)
+def templates(monkeypatch):
+    """Load the bundled templates and reset the module state between tests."""
+    cache = {img_path.stem: icon_detector._load_template(img_path) for img_path in TEMPLATE_DIR.glob("*.png")}
+    monkeypatch.setattr(icon_detector, "template_cache", cache)
+    monkeypatch.setattr(icon_detector, "template_hits", {})
+    monkeypatch.setattr(icon_detector, "icon_cache", None)
+    monkeypatch.setattr(icon_detector, "_last_hash", None)
+    monkeypatch.setattr(icon_detector, "_last_result", None)
+
+
+def _place(monkeypatch, label: str, position: tuple[int, int]) -> tuple[FakeScreen, tuple[int, int]]:
+    """Paste a template onto the desktop screenshot and return the screen and expected center."""
+    image = cv2.imread(str(DESKTOP))
+    template = cv2.imread(str(TEMPLATE_DIR / f"{label}.png"), cv2.IMREAD_UNCHANGED)
+    h, w = template.shape[:2]
+    x, y = position
+    region = image[y:y + h, x:x + w].astype(np.float32)
+    alpha = template[:, :, 3:4].astype(np.float32) / 255
+    image[y:y + h, x:x + w] = (template[:, :, :3] * alpha + region * (1 - alpha)).astype(np.uint8)
+
+    screen = FakeScreen(image)
+    monkeypatch.setattr(icon_detector, "_sct", screen)
+    return screen, (x + w // 2, y + h // 2)
+
+
+def _positions(label: str) -> list[tuple[int, int]]:
+    """Corners, the center and a few seeded random spots where the template fits on screen."""
+    image_h, image_w = cv2.imread(str(DESKTOP)).shape[:2]
+    h, w = cv2.imread(str(TEMPLATE_DIR / f"{label}.png")).shape[:2]
+    max_x, max_y = image_w - w, image_h - h
+    rng = np.random.default_rng(0)
+    random_spots = [(int(x), int(y)) for x, y in zip(rng.integers(0, max_x, 6), rng.integers(0, max_y, 6))]
+    return [(0, 0), (max_x, 0), (0, max_y), (max_x, max_y), (800, 400), *random_spots]
+
+
+@pytest.mark.parametrize("label", LABELS)
+def test_finds_placed_template(monkeypatch, label):
+    for position in _positions(label):
+        icon_detector._last_hash = None
+        _, expected = _place(monkeypatch, label, position)
+
+        score, coords = icon_detector.find_icon_with_multiple_templates([label])
+
+        assert score >= MATCHING_THRESHOLD, position
+        assert coords == expected, position
+
+
+@pytest.mark.parametrize("label", LABELS)
+def test_finds_placed_template_with_fft(monkeypatch, label):
+    monkeypatch.setattr(icon_detector, "FFT_MIN_TEMPLATES", 1)
+    _, expected = _place(monkeypatch, label, (800, 400))
+
+    score, coords = icon_detector.find_icon_with_multiple_templates([label])
+
+    assert score >= MATCHING_THRESHOLD
+    assert coords == expected
+
+
+@pytest.mark.parametrize("label", LABELS)
+def test_warm_cache_searches_only_around_cached_coords(monkeypatch, label):
+    clicks = []
+    monkeypatch.setattr(icon_detector.pyautogui, "doubleClick", lambda x, y: clicks.append((x, y)))
+    for position in _positions(label):
+        icon_detector._last_hash = None
+        screen, expected = _place(monkeypatch, label, position)
+        icon_detector.set_cache((expected[0] + 30, expected[1] - 20))
+
+        assert icon_detector.find_icon(None, [label]) == expected, position
+        assert clicks[-1] == expected
+        assert icon_detector.icon_cache == expected
+        # Found in the cached region without falling back to a full screen grab
+        assert [(grab["width"], grab["height"]) for grab in screen.grabs] == [(CACHE_REGION_SIZE, CACHE_REGION_SIZE)]
+
+
+def test_warm_cache_falls_back_when_icon_moved(monkeypatch):
+    monkeypatch.setattr(icon_detector.pyautogui, "doubleClick", lambda x, y: None)
+    screen, expected = _place(monkeypatch, "ID", (1500, 800))
+    icon_detector.set_cache((100, 100))
+
+    assert icon_detector.find_icon(None, ["ID"]) == expected
+    assert icon_detector.icon_cache == expected
+    assert (screen.grabs[-1]["width"], screen.grabs[-1]["height"]) == (1920, 1080)